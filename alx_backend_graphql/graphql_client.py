@@ -0,0 +1,69 @@
+"""
+GraphQL client helpers shared by the cron jobs: the schema dumped at deploy
+time and Automatic Persisted Query (APQ) sending for gql sessions
+
+Kept outside the crm app so standalone scripts can import it without
+loading crm/__init__.py (and with it Celery and Django settings)
+"""
+from gql.transport.exceptions import TransportQueryError
+from graphql import build_client_schema, print_ast
+from hashlib import sha256
+from pathlib import Path
+import json
+
+# Introspection result dumped at deploy time with:
+#   python manage.py graphql_schema --schema alx_backend_graphql.schema.schema --out schema.json
+SCHEMA_FILE = Path(__file__).resolve().parent.parent / "schema.json"
+
+
+def load_schema(path=SCHEMA_FILE):
+    """Load the pre-built client schema, or None if it was not dumped."""
+    try:
+        with open(path) as f:
+            introspection = json.load(f)
+    except FileNotFoundError:
+        return None
+    return build_client_schema(introspection.get("data", introspection))
+
+
+def persisted_query(document):
+    """Full query text and APQ extension (sha256 of that text) for a document."""
+    # gql 4 wraps the parsed document in a GraphQLRequest
+    query = print_ast(getattr(document, "document", document))
+    query_hash = sha256(query.encode("utf-8")).hexdigest()
+    return {
+        "query": query,
+        "extensions": {"persistedQuery": {"version": 1, "sha256Hash": query_hash}},
+    }
+
+
+def _hash_payload(persisted, variable_values):
+    payload = {"extensions": persisted["extensions"]}
+    if variable_values is not None:
+        payload["variables"] = variable_values
+    return payload
+
+
+def _is_persisted_query_miss(error):
+    return "PersistedQueryNotFound" in str(error)
+
+
+def execute_persisted(session, document, persisted, variable_values=None):
+    """
+    Send only the query hash; register the full query if the server misses it.
+    Uses the gql 3 session API (variable_values=); requirements.txt pins gql<4.
+    """
+    payload = _hash_payload(persisted, variable_values)
+    try:
+        return session.execute(
+            document, variable_values=variable_values, extra_args={"json": payload}
+        )
+    except TransportQueryError as e:
+        if not _is_persisted_query_miss(e):
+            raise
+        return session.execute(
+            document,
+            variable_values=variable_values,
+            extra_args={"json": {**payload, "query": persisted["query"]}},
+        )
+
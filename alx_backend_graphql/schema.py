@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import graphene
 from crm.schema import Query as CRMQuery, Mutation as CRMMutation
 
@@ -16,4 +18,12 @@ class Mutation(CRMMutation, graphene.ObjectType):
     pass
 
 
-schema = graphene.Schema(query=Query, mutation=Mutation)
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_schema():
+    """
+    Build the root schema once per process
+    """
+    return graphene.Schema(query=Query, mutation=Mutation)
+
+
+schema = get_schema()
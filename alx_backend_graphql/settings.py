@@ -43,7 +43,7 @@ INSTALLED_APPS = [
     'django_crontab',     
 ]
 GRAPHENE = {
-    'SCHEMA': 'graphql_crm.schema.schema',
+    'SCHEMA': 'alx_backend_graphql.schema.schema',
     'MIDDLEWARE': [
         'graphene_django.debug.DjangoDebugMiddleware',
     ],
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'alx_backend_graphql.settings')
 
 application = get_wsgi_application()
+
+# Build the GraphQL schema at import so a preloading server (see
+# gunicorn.conf.py) constructs it once and shares it with forked workers
+from alx_backend_graphql.schema import get_schema  # noqa: E402
+
+get_schema()
@@ -1,68 +1,97 @@
 from gql import gql, Client
-from gql.transport.requests import RequestsHTTPTransport
+from gql.transport.httpx import HTTPXTransport
 import datetime
+import httpx
+import os
 
-def log_crm_heartbeat():
-    """Logs CRM heartbeat and optionally checks GraphQL responsiveness."""
-    now = datetime.datetime.now().strftime("%d/%m/%Y-%H:%M:%S")
-    log_message = f"{now} CRM is alive\n"
-
-    # Append heartbeat to file
-    with open("/tmp/crm_heartbeat_log.txt", "a") as f:
-        f.write(log_message)
-
-    # Optional: Query GraphQL 'hello' field to verify endpoint
-    transport = RequestsHTTPTransport(
-        url="http://localhost:8000/graphql",
-        verify=True,
-        retries=3,
+from alx_backend_graphql.graphql_client import execute_persisted, load_schema, persisted_query
+
+GRAPHQL_ENDPOINT = "http://localhost:8000/graphql"
+
+# Client schema dumped at deploy time (see crm/README.md), or None
+_SCHEMA = load_schema()
+
+# Heartbeats are appended with one os.write per run; O_APPEND keeps
+# concurrent writers from interleaving within a line
+_HEARTBEAT_FD = os.open(
+    "/tmp/crm_heartbeat_log.txt", os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+)
+
+# GraphQL documents, parsed once at import
+# Liveness probe: __typename is valid against any schema
+_HELLO_Q = gql("{ __typename }")
+_LOW_STOCK_M = gql("""
+    mutation {
+        updateLowStockProducts {
+            updatedProducts {
+                name
+                stock
+            }
+            message
+        }
+    }
+""")
+
+
+# Automatic persisted queries: the server is sent these hashes instead of the text
+_HELLO_APQ = persisted_query(_HELLO_Q)
+_LOW_STOCK_APQ = persisted_query(_LOW_STOCK_M)
+
+
+def _client():
+    """GraphQL client for one cron run, retrying failed connections."""
+    transport = HTTPXTransport(
+        url=GRAPHQL_ENDPOINT,
+        transport=httpx.HTTPTransport(retries=3),
     )
+    return Client(transport=transport, schema=_SCHEMA, fetch_schema_from_transport=False)
 
-    client = Client(transport=transport, fetch_schema_from_transport=False)
 
+def _now():
+    return datetime.datetime.now().strftime("%d/%m/%Y-%H:%M:%S")
+
+
+def _heartbeat(session, now):
+    # Optional: Query GraphQL to verify the endpoint responds
     try:
-        query = gql("{ hello }")
-        response = client.execute(query)
-        with open("/tmp/crm_heartbeat_log.txt", "a") as f:
-            f.write(f"{now} GraphQL response: {response}\n")
+        response = execute_persisted(session, _HELLO_Q, _HELLO_APQ)
+        outcome = f"GraphQL response: {response}"
     except Exception as e:
-        with open("/tmp/crm_heartbeat_log.txt", "a") as f:
-            f.write(f"{now} GraphQL query failed: {e}\n")
+        outcome = f"GraphQL query failed: {e}"
 
-def update_low_stock():
-    """Runs every 12 hours to restock low-stock products via GraphQL mutation."""
-    now = datetime.datetime.now().strftime("%d/%m/%Y-%H:%M:%S")
-    log_file = "/tmp/low_stock_updates_log.txt"
+    # Append heartbeat and GraphQL result in a single write() syscall
+    os.write(_HEARTBEAT_FD, f"{now} CRM is alive\n{now} {outcome}\n".encode())
 
-    transport = RequestsHTTPTransport(
-        url="http://localhost:8000/graphql",
-        verify=True,
-        retries=3,
-    )
-    client = Client(transport=transport, fetch_schema_from_transport=False)
-
-    mutation = gql("""
-        mutation {
-            updateLowStockProducts {
-                updatedProducts {
-                    name
-                    stock
-                }
-                message
-            }
-        }
-    """)
+
+def _update_low_stock(session, now):
+    log_file = "/tmp/low_stock_updates_log.txt"
 
     try:
-        response = client.execute(mutation)
+        response = execute_persisted(session, _LOW_STOCK_M, _LOW_STOCK_APQ)
         updated = response.get("updateLowStockProducts", {}).get("updatedProducts", [])
         message = response.get("updateLowStockProducts", {}).get("message", "")
 
-        with open(log_file, "a") as f:
-            f.write(f"{now} - {message}\n")
-            for product in updated:
-                f.write(f"{now} - Product: {product['name']}, Stock: {product['stock']}\n")
+        body = "\n".join(
+            f"{now} - Product: {product['name']}, Stock: {product['stock']}"
+            for product in updated
+        )
+        entry = f"{now} - {message}\n{body}\n" if updated else f"{now} - {message}\n"
 
     except Exception as e:
-        with open(log_file, "a") as f:
-            f.write(f"{now} - Error executing mutation: {e}\n")
\ No newline at end of file
+        entry = f"{now} - Error executing mutation: {e}\n"
+
+    # One string, one write
+    with open(log_file, "a") as f:
+        f.write(entry)
+
+
+def log_crm_heartbeat():
+    """Logs CRM heartbeat and optionally checks GraphQL responsiveness."""
+    with _client() as session:
+        _heartbeat(session, _now())
+
+
+def update_low_stock():
+    """Restocks low-stock products via GraphQL mutation."""
+    with _client() as session:
+        _update_low_stock(session, _now())
@@ -1,55 +1,128 @@
 #!/usr/bin/env python3
 import os
 import sys
+import argparse
 import datetime
+import logging
+from logging.handlers import RotatingFileHandler
+import httpx
 from gql import gql, Client
-from gql.transport.requests import RequestsHTTPTransport
+from gql.transport.httpx import HTTPXTransport
+
+# Run as a script: make the project root importable for the shared client helpers
+# (alx_backend_graphql/__init__.py is empty, so this does not load Django or Celery)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from alx_backend_graphql.graphql_client import execute_persisted, load_schema, persisted_query  # noqa: E402
 
 # Define constants
 GRAPHQL_ENDPOINT = "http://localhost:8000/graphql"
 LOG_FILE = "/tmp/order_reminders_log.txt"
+LOG_MAX_BYTES = 10_000_000
+LOG_BACKUP_COUNT = 5
 
-def main():
-    # Define time window (orders within last 7 days)
-    now = datetime.datetime.now()
-    seven_days_ago = now - datetime.timedelta(days=7)
-
-    # Prepare GraphQL query
-    query = gql("""
-        query GetRecentOrders($startDate: DateTime!) {
-            orders(orderDate_Gte: $startDate) {
-                id
-                customer {
-                    email
+logger = logging.getLogger("order_reminders")
+
+# Page size for the orders connection (capped by RELAY_CONNECTION_MAX_LIMIT)
+PAGE_SIZE = 100
+
+# GraphQL query, parsed once at import
+RECENT_ORDERS_QUERY = gql("""
+    query GetRecentOrders($startDate: DateTime!, $first: Int!, $after: String) {
+        allOrders(orderDateGte: $startDate, first: $first, after: $after) {
+            edges {
+                node {
+                    id
+                    customer {
+                        email
+                    }
                 }
             }
+            pageInfo {
+                hasNextPage
+                endCursor
+            }
         }
-    """)
+    }
+""")
+
+# Automatic persisted query: the server is sent this hash instead of the query text
+RECENT_ORDERS_APQ = persisted_query(RECENT_ORDERS_QUERY)
+
+
+def setup_logging():
+    """Send reminder log records to a size-capped, rotated LOG_FILE."""
+    handler = RotatingFileHandler(
+        LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Log reminders for recent orders.")
+    parser.add_argument(
+        "--since-days",
+        type=int,
+        default=7,
+        help="Look back this many days for orders (default: 7)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging()
+
+    # Define time window (orders within the last --since-days days)
+    now = datetime.datetime.now()
+    start_date = now - datetime.timedelta(days=args.since_days)
+    timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
 
     # Configure GraphQL client
-    transport = RequestsHTTPTransport(url=GRAPHQL_ENDPOINT, verify=False)
-    client = Client(transport=transport, fetch_schema_from_transport=False)
+    transport = HTTPXTransport(
+        url=GRAPHQL_ENDPOINT,
+        verify=False,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=10),
+    )
+    client = Client(
+        transport=transport,
+        schema=load_schema(),
+        fetch_schema_from_transport=False,
+    )
 
     try:
-        # Execute query
-        variables = {"startDate": seven_days_ago.isoformat()}
-        response = client.execute(query, variable_values=variables)
-
-        # Write results to log
-        with open(LOG_FILE, "a") as f:
-            timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
-            orders = response.get("orders", [])
-            for order in orders:
-                order_id = order["id"]
-                email = order["customer"]["email"]
-                f.write(f"{timestamp} - Order ID: {order_id}, Customer: {email}\n")
+        variables = {
+            "startDate": start_date.isoformat(),
+            "first": PAGE_SIZE,
+            "after": None,
+        }
+
+        # Fetch one page at a time, logging its lines as a single record
+        # (one write) before the next request
+        with client as session:
+            while True:
+                response = execute_persisted(
+                    session, RECENT_ORDERS_QUERY, RECENT_ORDERS_APQ, variables
+                )
+                connection = response["allOrders"]
+                if connection["edges"]:
+                    logger.info("\n".join(
+                        f"{timestamp} - Order ID: {edge['node']['id']}, "
+                        f"Customer: {edge['node']['customer']['email']}"
+                        for edge in connection["edges"]
+                    ))
+
+                page_info = connection["pageInfo"]
+                if not page_info["hasNextPage"]:
+                    break
+                variables["after"] = page_info["endCursor"]
 
         print("Order reminders processed!")
 
     except Exception as e:
-        with open(LOG_FILE, "a") as f:
-            timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"{timestamp} - Error: {str(e)}\n")
+        logger.error(f"{timestamp} - Error: {str(e)}")
         print(f"Error processing reminders: {e}", file=sys.stderr)
 
 
@@ -1,5 +1,7 @@
 import django_filters
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q, Value
+from django.db.models.functions import Lower
+from graphene_django.filter import GlobalIDFilter
 from .models import Customer, Product, Order
 
 
@@ -20,6 +22,12 @@ class CustomerFilter(django_filters.FilterSet):
         label='Email (partial match)'
     )
     
+    # Case-insensitive exact match for email (served by customer_email_lower_idx)
+    email_exact = django_filters.CharFilter(
+        method='filter_email_exact',
+        label='Email (exact match)'
+    )
+    
     # Date range filters for created_at
     created_at_gte = django_filters.DateTimeFilter(
         field_name='created_at',
@@ -39,6 +47,18 @@ class CustomerFilter(django_filters.FilterSet):
         label='Phone pattern (e.g., +1 for US numbers)'
     )
     
+    def filter_email_exact(self, queryset, name, value):
+        """
+        Match email case-insensitively via lower(email) so the functional index is used
+        Both sides are lowered by the database so they fold case the same way
+        Example: email_exact="Alice@Example.com" matches alice@example.com
+        """
+        if value:
+            return queryset.alias(email_lower=Lower('email')).filter(
+                email_lower=Lower(Value(value))
+            )
+        return queryset
+    
     def filter_phone_pattern(self, queryset, name, value):
         """
         Custom filter method to match phone numbers starting with a pattern
@@ -48,12 +68,11 @@ class CustomerFilter(django_filters.FilterSet):
             return queryset.filter(phone__startswith=value)
         return queryset
     
+    # Model-generated lookups with no declared equivalent above
     class Meta:
         model = Customer
         fields = {
-            'name': ['exact', 'icontains'],
-            'email': ['exact', 'icontains'],
-            'created_at': ['exact', 'gte', 'lte'],
+            'created_at': ['exact'],
             'phone': ['exact', 'icontains'],
         }
 
@@ -109,17 +128,22 @@ class ProductFilter(django_filters.FilterSet):
             return queryset.filter(stock__lt=10)
         return queryset
     
+    # Model-generated lookups with no declared equivalent above
     class Meta:
         model = Product
         fields = {
-            'name': ['exact', 'icontains'],
-            'price': ['exact', 'gte', 'lte'],
-            'stock': ['exact', 'gte', 'lte'],
+            'price': ['exact'],
+            'stock': ['exact'],
         }
 
 
 class OrderFilter(django_filters.FilterSet):
-    """Filter class for Order model"""
+    """
+    Filter class for Order model
+    Resolvers returning OrderFilter(...).qs should add
+    .select_related('customer').prefetch_related('products') (or use lean_qs)
+    so order.customer / order.products don't trigger a query per order
+    """
     
     # Total amount range filters
     total_amount_gte = django_filters.NumberFilter(
@@ -147,6 +171,12 @@ class OrderFilter(django_filters.FilterSet):
         label='Order date to (inclusive)'
     )
     
+    # Filter by customer (Relay global ID)
+    customer = GlobalIDFilter(
+        field_name='customer',
+        label='Customer ID'
+    )
+    
     # Filter by customer name (related field lookup)
     customer_name = django_filters.CharFilter(
         field_name='customer__name',
@@ -161,28 +191,22 @@ class OrderFilter(django_filters.FilterSet):
         label='Customer email (partial match)'
     )
     
-    # Filter by product name (related field lookup)
+    # Filter by product name (EXISTS subquery, no join + DISTINCT)
     product_name = django_filters.CharFilter(
-        field_name='products__name',
-        lookup_expr='icontains',
-        label='Product name (partial match)',
-        distinct=True
+        method='filter_product_name',
+        label='Product name (partial match)'
     )
     
     # Filter orders containing a specific product ID
     product_id = django_filters.NumberFilter(
-        field_name='products__id',
-        lookup_expr='exact',
-        label='Product ID',
-        distinct=True
+        method='filter_product_id',
+        label='Product ID'
     )
     
     # Multiple product IDs filter
     product_ids = django_filters.BaseInFilter(
-        field_name='products__id',
-        lookup_expr='in',
-        label='Product IDs (comma-separated)',
-        distinct=True
+        method='filter_product_ids',
+        label='Product IDs (comma-separated)'
     )
     
     # Custom filter for high-value orders
@@ -200,10 +224,71 @@ class OrderFilter(django_filters.FilterSet):
             return queryset.filter(total_amount__gte=1000)
         return queryset
     
+    def filter_product_name(self, queryset, name, value):
+        """
+        Filter orders containing a product whose name matches (partial match)
+        Usage: product_name="lap"
+        """
+        if value:
+            return filter_order_products(queryset, product__name__icontains=value)
+        return queryset
+    
+    def filter_product_id(self, queryset, name, value):
+        """
+        Filter orders containing the given product
+        Usage: product_id=3
+        """
+        if value is not None:
+            return filter_order_products(queryset, product_id=value)
+        return queryset
+    
+    def filter_product_ids(self, queryset, name, value):
+        """
+        Filter orders containing any of the given products
+        Usage: product_ids=1,2,3
+        """
+        if value:
+            return filter_order_products(queryset, product_id__in=value)
+        return queryset
+    
+    def lean_qs(self, fields):
+        """
+        Filtered queryset that only loads the given Order fields
+        Usage: OrderFilter(data, queryset=qs).lean_qs(['id', 'customer__email'])
+        """
+        return only_order_fields(self.qs, fields)
+    
+    # Model-generated lookups with no declared equivalent above
     class Meta:
         model = Order
         fields = {
-            'total_amount': ['exact', 'gte', 'lte'],
-            'order_date': ['exact', 'gte', 'lte'],
-            'customer': ['exact'],
-        }
\ No newline at end of file
+            'total_amount': ['exact'],
+            'order_date': ['exact'],
+        }
+
+
+def filter_order_products(queryset, **lookups):
+    """Keep orders with at least one order/product row matching lookups"""
+    order_products = Order.products.through.objects.filter(order_id=OuterRef('pk'), **lookups)
+    return queryset.filter(Exists(order_products))
+
+
+def only_order_fields(queryset, fields):
+    """
+    Restrict an Order queryset to the given fields, joining the customer
+    (and keeping its foreign key) when customer__* fields are requested
+    """
+    fields = list(fields)
+    if any(field.startswith('customer__') for field in fields):
+        queryset = queryset.select_related('customer')
+        fields.append('customer')
+    return queryset.only(*fields)
+
+
+def iter_orders(data=None, chunk_size=2000):
+    """
+    Stream filtered orders for batch jobs instead of materializing the result
+    Usage: for order in iter_orders({'high_value': True}): ...
+    """
+    queryset = Order.objects.select_related('customer')
+    return OrderFilter(data or {}, queryset=queryset).qs.iterator(chunk_size=chunk_size)
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+# Trigram GIN indexes let Postgres serve the icontains (ILIKE '%value%')
+# filters on these columns from an index instead of a sequential scan.
+# Other backends have no pg_trgm, so the migration is a no-op there.
+TRIGRAM_INDEXES = [
+    ('customer_name_trgm', 'crm_customer', 'name'),
+    ('customer_email_trgm', 'crm_customer', 'email'),
+    ('product_name_trgm', 'crm_product', 'name'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} '
+            f'ON {table} USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, _table, _column in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0002_alter_customer_name_alter_product_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
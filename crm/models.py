@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 
@@ -15,6 +16,9 @@ class Customer(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(Lower('email'), name='customer_email_lower_idx'),
+        ]
 
 
 class Product(models.Model):
@@ -36,6 +40,10 @@ class Product(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Matches ProductFilter.filter_low_stock / UpdateLowStockProducts
+            models.Index(fields=['stock'], name='product_low_stock_idx', condition=models.Q(stock__lt=10)),
+        ]
 
 
 class Order(models.Model):
@@ -59,6 +67,10 @@ class Order(models.Model):
 
     class Meta:
         ordering = ['-order_date']
+        indexes = [
+            # Matches OrderFilter.filter_high_value
+            models.Index(fields=['total_amount'], name='order_high_value_idx', condition=models.Q(total_amount__gte=1000)),
+        ]
 
     def calculate_total(self):
         """Calculate total amount from associated products"""
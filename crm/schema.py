@@ -1,14 +1,27 @@
 import graphene
 from graphene_django import DjangoObjectType
 from graphene_django.filter import DjangoFilterConnectionField
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from graphql import FieldNode
 import re
+from decimal import Decimal
 from .models import Customer, Product, Order
-from .filters import CustomerFilter, ProductFilter, OrderFilter
+from .filters import CustomerFilter, ProductFilter, OrderFilter, only_order_fields
 from crm.models import Product
 
+# ``limit`` for the non-relay *_list fields: default page and hard cap
+LIST_DEFAULT_LIMIT = 100
+LIST_MAX_LIMIT = 1000
+
+# Money is returned with two decimal places (SQLite's SUM yields float-derived Decimals)
+CENTS = Decimal('0.01')
+
+# Phone format: +1234567890 or 123-456-7890 (compiled once at import)
+_PHONE_RE = re.compile(r'^(\+?\d{10,15}|\d{3}-\d{3}-\d{4})$')
+
 # Object Types with Connection support
 class CustomerType(DjangoObjectType):
     class Meta:
@@ -33,6 +46,14 @@ class OrderType(DjangoObjectType):
         filterset_class = OrderFilter
         interfaces = (graphene.relay.Node,)
 
+    @classmethod
+    def get_queryset(cls, queryset, info):
+        # Used by connection fields and node lookups alike
+        queryset = queryset.select_related('customer')
+        if order_selection_selects(info, 'products'):
+            queryset = queryset.prefetch_related('products')
+        return queryset
+
 
 # Input Types
 class CustomerInput(graphene.InputObjectType):
@@ -88,8 +109,7 @@ def validate_phone(phone):
     """Validate phone format: +1234567890 or 123-456-7890"""
     if not phone:
         return True
-    pattern = r'^(\+?\d{10,15}|\d{3}-\d{3}-\d{4})$'
-    return re.match(pattern, phone) is not None
+    return _PHONE_RE.match(phone) is not None
 
 
 def validate_email_unique(email, exclude_id=None):
@@ -100,27 +120,175 @@ def validate_email_unique(email, exclude_id=None):
     return not query.exists()
 
 
-def apply_custom_filters(queryset, filter_input):
-    """Apply custom filters to queryset"""
-    if not filter_input:
+# Order / Customer columns backing the GraphQL fields a lean orders query may select
+ORDER_ONLY_FIELDS = {
+    'id': 'id',
+    'totalAmount': 'total_amount',
+    'orderDate': 'order_date',
+    'createdAt': 'created_at',
+    'updatedAt': 'updated_at',
+}
+
+CUSTOMER_ONLY_FIELDS = {
+    'id': 'customer__id',
+    'name': 'customer__name',
+    'email': 'customer__email',
+    'phone': 'customer__phone',
+    'createdAt': 'customer__created_at',
+    'updatedAt': 'customer__updated_at',
+}
+
+
+def _selected_fields(selection_set, mapping):
+    """
+    Map a selection set onto model fields, or return None if it selects
+    anything not covered by mapping (fragments, relations, ...)
+    """
+    fields = []
+    for selection in selection_set.selections:
+        name = getattr(selection, 'name', None)
+        if name is None:
+            return None
+        if name.value == '__typename':
+            continue
+        if name.value not in mapping:
+            return None
+        fields.append(mapping[name.value])
+    return fields
+
+
+def order_node_fields(selection_set):
+    """Model fields needed for an OrderType selection set, or None"""
+    fields = []
+    for selection in selection_set.selections:
+        name = getattr(selection, 'name', None)
+        if name is None:
+            return None
+        if name.value == '__typename':
+            continue
+        if name.value == 'customer' and selection.selection_set:
+            customer_fields = _selected_fields(selection.selection_set, CUSTOMER_ONLY_FIELDS)
+            if customer_fields is None:
+                return None
+            fields.extend(customer_fields)
+        elif name.value in ORDER_ONLY_FIELDS:
+            fields.append(ORDER_ONLY_FIELDS[name.value])
+        else:
+            return None
+    return fields
+
+
+def connection_order_fields(info):
+    """Model fields needed for the edges.node selection of an orders connection, or None"""
+    fields = None
+    for selection in info.field_nodes[0].selection_set.selections:
+        name = getattr(selection, 'name', None)
+        if name is None:
+            return None
+        if name.value != 'edges':
+            continue
+        for edge_selection in selection.selection_set.selections:
+            edge_name = getattr(edge_selection, 'name', None)
+            if edge_name is None:
+                return None
+            if edge_name.value == 'node':
+                fields = order_node_fields(edge_selection.selection_set)
+                if fields is None:
+                    return None
+    return fields
+
+
+def selects_field(selection_set, name):
+    """True if selection_set selects name, or may do so through a fragment"""
+    for selection in selection_set.selections:
+        if not isinstance(selection, FieldNode) or selection.name.value == name:
+            return True
+    return False
+
+
+def order_selection_selects(info, name):
+    """
+    True if the orders selected by info may include name, whether the field
+    returns OrderType directly or an orders connection (edges.node)
+    """
+    selection_set = info.field_nodes[0].selection_set
+    if selects_field(selection_set, name):
+        return True
+    for selection in selection_set.selections:
+        if selection.name.value != 'edges' or not selection.selection_set:
+            continue
+        for edge_selection in selection.selection_set.selections:
+            if not isinstance(edge_selection, FieldNode):
+                return True
+            if edge_selection.name.value == 'node' and selects_field(edge_selection.selection_set, name):
+                return True
+    return False
+
+
+def order_queryset(info):
+    """
+    Orders for a field returning OrderType: only the selected columns when the
+    selection is limited to scalar order/customer fields, else the full joins
+    (products are only prefetched when they may be selected)
+    """
+    selection_set = info.field_nodes[0].selection_set
+    fields = order_node_fields(selection_set)
+    if fields:
+        return only_order_fields(Order.objects.all(), fields)
+    queryset = Order.objects.select_related('customer')
+    if order_selection_selects(info, 'products'):
+        queryset = queryset.prefetch_related('products')
+    return queryset
+
+
+# *FilterInput keys whose FilterSet filter has a different name
+LIST_FILTER_NAMES = {
+    'name_icontains': 'name',
+    'email_icontains': 'email',
+}
+
+
+def filter_list(filterset_class, queryset, filter_input, order_by, limit):
+    """Filter, order and limit a *_list queryset through filterset_class"""
+    data = {
+        LIST_FILTER_NAMES.get(key, key): value
+        for key, value in (filter_input or {}).items()
+        if value is not None
+    }
+    filterset = filterset_class(data, queryset=queryset)
+    if not filterset.is_valid():
+        raise ValidationError(filterset.form.errors.as_json())
+    queryset = filterset.qs
+    if order_by:
+        queryset = queryset.order_by(order_by)
+    return limit_list(queryset, limit)
+
+
+def limit_list(queryset, limit):
+    """Slice a *_list queryset to limit, capped at LIST_MAX_LIMIT"""
+    if limit is None:
+        limit = LIST_DEFAULT_LIMIT
+    return queryset[:max(0, min(limit, LIST_MAX_LIMIT))]
+
+
+class OrderFilterConnectionField(DjangoFilterConnectionField):
+    """
+    Filter connection for orders that only loads the columns the query
+    selects when the selection is limited to scalar order/customer fields
+    """
+
+    @classmethod
+    def resolve_queryset(cls, connection, iterable, info, args, filtering_args, filterset_class):
+        queryset = super().resolve_queryset(
+            connection, iterable, info, args, filtering_args, filterset_class
+        )
+        fields = connection_order_fields(info)
+        if fields:
+            # Reset OrderType.get_queryset's joins; only_order_fields re-adds
+            # the customer join when customer fields are selected
+            queryset = queryset.select_related(None).prefetch_related(None)
+            return only_order_fields(queryset, fields)
         return queryset
-    
-    filter_dict = {}
-    for key, value in filter_input.items():
-        if value is not None:
-            # Convert GraphQL filter names to Django filter syntax
-            if key.endswith('_icontains'):
-                field_name = key.replace('_icontains', '__icontains')
-            elif key.endswith('_gte'):
-                field_name = key.replace('_gte', '__gte')
-            elif key.endswith('_lte'):
-                field_name = key.replace('_lte', '__lte')
-            else:
-                field_name = key
-            
-            filter_dict[field_name] = value
-    
-    return queryset.filter(**filter_dict) if filter_dict else queryset
 
 
 # Mutations
@@ -134,14 +302,6 @@ class CreateCustomer(graphene.Mutation):
 
     def mutate(self, info, input):
         try:
-            # Validate email uniqueness
-            if not validate_email_unique(input.email):
-                return CreateCustomer(
-                    customer=None,
-                    message="Email already exists",
-                    success=False
-                )
-
             # Validate phone format
             if input.phone and not validate_phone(input.phone):
                 return CreateCustomer(
@@ -156,8 +316,18 @@ class CreateCustomer(graphene.Mutation):
                 email=input.email,
                 phone=input.phone if input.phone else None
             )
-            customer.full_clean()
-            customer.save()
+            # Email uniqueness is enforced by the UNIQUE index on insert
+            # rather than a pre-flight SELECT
+            customer.full_clean(validate_unique=False)
+            try:
+                with transaction.atomic():
+                    customer.save()
+            except IntegrityError:
+                return CreateCustomer(
+                    customer=None,
+                    message="Email already exists",
+                    success=False
+                )
 
             return CreateCustomer(
                 customer=customer,
@@ -188,14 +358,21 @@ class BulkCreateCustomers(graphene.Mutation):
     success = graphene.Boolean()
 
     def mutate(self, info, input):
-        created_customers = []
+        pending = []
         errors = []
 
+        # Load already-used emails in one query instead of one per row
+        input_emails = [customer_data.email for customer_data in input]
+        existing_emails = set(
+            Customer.objects.filter(email__in=input_emails).values_list('email', flat=True)
+        )
+        seen_in_batch = set()
+
         with transaction.atomic():
             for idx, customer_data in enumerate(input):
                 try:
-                    # Validate email uniqueness
-                    if not validate_email_unique(customer_data.email):
+                    # Validate email uniqueness (against the DB and earlier rows)
+                    if customer_data.email in existing_emails or customer_data.email in seen_in_batch:
                         errors.append(
                             f"Row {idx + 1}: Email '{customer_data.email}' already exists"
                         )
@@ -214,15 +391,19 @@ class BulkCreateCustomers(graphene.Mutation):
                         email=customer_data.email,
                         phone=customer_data.phone if customer_data.phone else None
                     )
-                    customer.full_clean()
-                    customer.save()
-                    created_customers.append(customer)
+                    # Uniqueness was checked above; skip full_clean's per-row query
+                    customer.full_clean(validate_unique=False)
+                    pending.append(customer)
+                    seen_in_batch.add(customer_data.email)
 
                 except ValidationError as e:
                     errors.append(f"Row {idx + 1}: {str(e)}")
                 except Exception as e:
                     errors.append(f"Row {idx + 1}: {str(e)}")
 
+            # Insert all valid rows with multi-row INSERTs
+            created_customers = Customer.objects.bulk_create(pending, batch_size=500)
+
         return BulkCreateCustomers(
             customers=created_customers,
             errors=errors if errors else None,
@@ -296,51 +477,45 @@ class CreateOrder(graphene.Mutation):
 
     def mutate(self, info, input):
         try:
-            # Validate customer exists
-            try:
-                customer = Customer.objects.get(id=input.customer_id)
-            except Customer.DoesNotExist:
-                return CreateOrder(
-                    order=None,
-                    message=f"Customer with ID {input.customer_id} does not exist",
-                    success=False
-                )
+            # Look up customer and products and create the order in one transaction
+            with transaction.atomic():
+                # Validate customer exists (the order only needs its id)
+                if not Customer.objects.filter(pk=input.customer_id).exists():
+                    return CreateOrder(
+                        order=None,
+                        message=f"Customer with ID {input.customer_id} does not exist",
+                        success=False
+                    )
 
-            # Validate at least one product
-            if not input.product_ids or len(input.product_ids) == 0:
-                return CreateOrder(
-                    order=None,
-                    message="At least one product must be provided",
-                    success=False
-                )
+                # Validate at least one product
+                if not input.product_ids or len(input.product_ids) == 0:
+                    return CreateOrder(
+                        order=None,
+                        message="At least one product must be provided",
+                        success=False
+                    )
 
-            # Validate all products exist
-            products = []
-            for product_id in input.product_ids:
-                try:
-                    product = Product.objects.get(id=product_id)
-                    products.append(product)
-                except Product.DoesNotExist:
+                # Validate all products exist and total their prices in one query
+                product_ids = {str(pid) for pid in input.product_ids}
+                products = Product.objects.filter(id__in=product_ids)
+                totals = products.aggregate(count=Count('id'), total=Sum('price'))
+                if totals['count'] != len(product_ids):
+                    found_ids = {str(pk) for pk in products.values_list('id', flat=True)}
+                    missing = [pid for pid in input.product_ids if str(pid) not in found_ids]
                     return CreateOrder(
                         order=None,
-                        message=f"Invalid product ID: {product_id}",
+                        message=f"Invalid product ID: {missing[0]}",
                         success=False
                     )
 
-            # Create order with transaction
-            with transaction.atomic():
-                order = Order(customer=customer)
+                # Total computed by the DB up front so the order is saved once
+                order = Order(customer_id=input.customer_id, total_amount=totals['total'].quantize(CENTS))
                 if input.order_date:
                     order.order_date = input.order_date
                 order.save()
 
                 # Associate products
-                order.products.set(products)
-
-                # Calculate total amount
-                total = sum(product.price for product in products)
-                order.total_amount = total
-                order.save()
+                order.products.set(product_ids)
 
             return CreateOrder(
                 order=order,
@@ -377,7 +552,7 @@ class Query(graphene.ObjectType):
         order_by=graphene.String()
     )
     
-    all_orders = DjangoFilterConnectionField(
+    all_orders = OrderFilterConnectionField(
         OrderType,
         filterset_class=OrderFilter,
         order_by=graphene.String()
@@ -392,20 +567,28 @@ class Query(graphene.ObjectType):
     customers_list = graphene.List(
         CustomerType,
         filter=CustomerFilterInput(),
-        order_by=graphene.String()
+        order_by=graphene.String(),
+        limit=graphene.Int(default_value=LIST_DEFAULT_LIMIT)
     )
     
     products_list = graphene.List(
         ProductType,
         filter=ProductFilterInput(),
-        order_by=graphene.String()
+        order_by=graphene.String(),
+        limit=graphene.Int(default_value=LIST_DEFAULT_LIMIT)
     )
     
     orders_list = graphene.List(
         OrderType,
         filter=OrderFilterInput(),
-        order_by=graphene.String()
+        order_by=graphene.String(),
+        limit=graphene.Int(default_value=LIST_DEFAULT_LIMIT)
     )
+    
+    # Aggregates computed in the database
+    total_customers = graphene.Int()
+    total_orders = graphene.Int()
+    total_revenue = graphene.Decimal()
 
     # Resolvers for single objects
     def resolve_customer(self, info, id):
@@ -422,96 +605,52 @@ class Query(graphene.ObjectType):
 
     def resolve_order(self, info, id):
         try:
-            return Order.objects.get(id=id)
+            return order_queryset(info).get(id=id)
         except Order.DoesNotExist:
             return None
 
-    # Resolvers for list queries with custom filtering
-    def resolve_customers_list(self, info, filter=None, order_by=None):
-        queryset = Customer.objects.all()
-        
-        if filter:
-            if filter.get('name_icontains'):
-                queryset = queryset.filter(name__icontains=filter['name_icontains'])
-            if filter.get('email_icontains'):
-                queryset = queryset.filter(email__icontains=filter['email_icontains'])
-            if filter.get('created_at_gte'):
-                queryset = queryset.filter(created_at__gte=filter['created_at_gte'])
-            if filter.get('created_at_lte'):
-                queryset = queryset.filter(created_at__lte=filter['created_at_lte'])
-            if filter.get('phone_pattern'):
-                queryset = queryset.filter(phone__startswith=filter['phone_pattern'])
-        
-        if order_by:
-            queryset = queryset.order_by(order_by)
-        
-        return queryset
+    def resolve_total_customers(self, info):
+        return Customer.objects.count()
 
-    def resolve_products_list(self, info, filter=None, order_by=None):
-        queryset = Product.objects.all()
-        
-        if filter:
-            if filter.get('name_icontains'):
-                queryset = queryset.filter(name__icontains=filter['name_icontains'])
-            if filter.get('price_gte'):
-                queryset = queryset.filter(price__gte=filter['price_gte'])
-            if filter.get('price_lte'):
-                queryset = queryset.filter(price__lte=filter['price_lte'])
-            if filter.get('stock_gte'):
-                queryset = queryset.filter(stock__gte=filter['stock_gte'])
-            if filter.get('stock_lte'):
-                queryset = queryset.filter(stock__lte=filter['stock_lte'])
-            if filter.get('low_stock'):
-                queryset = queryset.filter(stock__lt=10)
-        
-        if order_by:
-            queryset = queryset.order_by(order_by)
-        
-        return queryset
+    def resolve_total_orders(self, info):
+        return Order.objects.count()
+
+    def resolve_total_revenue(self, info):
+        total = Order.objects.aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
+        return total.quantize(CENTS)
+
+    # Resolvers for list queries, filtered by the same FilterSets as the connections
+    def resolve_customers_list(self, info, filter=None, order_by=None, limit=LIST_DEFAULT_LIMIT):
+        return filter_list(CustomerFilter, Customer.objects.all(), filter, order_by, limit)
+
+    def resolve_products_list(self, info, filter=None, order_by=None, limit=LIST_DEFAULT_LIMIT):
+        return filter_list(ProductFilter, Product.objects.all(), filter, order_by, limit)
+
+    def resolve_orders_list(self, info, filter=None, order_by=None, limit=LIST_DEFAULT_LIMIT):
+        return filter_list(OrderFilter, order_queryset(info), filter, order_by, limit)
 
-    def resolve_orders_list(self, info, filter=None, order_by=None):
-        queryset = Order.objects.select_related('customer').prefetch_related('products').all()
-        
-        if filter:
-            if filter.get('total_amount_gte'):
-                queryset = queryset.filter(total_amount__gte=filter['total_amount_gte'])
-            if filter.get('total_amount_lte'):
-                queryset = queryset.filter(total_amount__lte=filter['total_amount_lte'])
-            if filter.get('order_date_gte'):
-                queryset = queryset.filter(order_date__gte=filter['order_date_gte'])
-            if filter.get('order_date_lte'):
-                queryset = queryset.filter(order_date__lte=filter['order_date_lte'])
-            if filter.get('customer_name'):
-                queryset = queryset.filter(customer__name__icontains=filter['customer_name'])
-            if filter.get('customer_email'):
-                queryset = queryset.filter(customer__email__icontains=filter['customer_email'])
-            if filter.get('product_name'):
-                queryset = queryset.filter(products__name__icontains=filter['product_name']).distinct()
-            if filter.get('product_id'):
-                queryset = queryset.filter(products__id=filter['product_id']).distinct()
-            if filter.get('high_value'):
-                queryset = queryset.filter(total_amount__gte=1000)
-        
-        if order_by:
-            queryset = queryset.order_by(order_by)
-        
-        return queryset
 
 class UpdateLowStockProducts(graphene.Mutation):
     updated_products = graphene.List(ProductType)
     message = graphene.String()
 
     def mutate(self, info):
-        from .models import Product
-
-        # Find products with stock < 10
-        low_stock_products = Product.objects.filter(stock__lt=10)
-        updated_list = []
+        with transaction.atomic():
+            # Find and lock products with stock < 10 (ids captured first so the
+            # re-read doesn't pick up rows that became low-stock after the update)
+            ids = list(
+                Product.objects.select_for_update()
+                .filter(stock__lt=10)
+                .values_list('id', flat=True)
+            )
 
-        for product in low_stock_products:
-            product.stock += 10  # restock
-            product.save()
-            updated_list.append(product)
+            # Restock in a single UPDATE; the stock predicate keeps a row that
+            # was restocked in the meantime from getting +10 twice
+            Product.objects.filter(id__in=ids, stock__lt=10).update(
+                stock=F('stock') + 10,
+                updated_at=timezone.now()
+            )
+            updated_list = list(Product.objects.filter(id__in=ids))
 
         return UpdateLowStockProducts(
             updated_products=updated_list,
@@ -526,7 +665,3 @@ class Mutation(graphene.ObjectType):
     create_product = CreateProduct.Field()
     create_order = CreateOrder.Field()
     update_low_stock_products = UpdateLowStockProducts.Field()
-
-# Schema
-schema = graphene.Schema(query=Query, mutation=Mutation)
-
@@ -12,16 +12,23 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'graphql_crm.settings')
 django.setup()
 
 from crm.models import Customer, Product, Order
-from django.db import transaction
+from django.db import connection, transaction
 from decimal import Decimal
 
 
 def clear_database():
     """Clear all existing data"""
     print("Clearing existing data...")
-    Order.objects.all().delete()
-    Customer.objects.all().delete()
-    Product.objects.all().delete()
+    # No signals are attached to these models, so skip delete()'s
+    # fetch-then-cascade and empty the tables directly
+    models = [Order.products.through, Order, Customer, Product]
+    if connection.vendor == 'postgresql':
+        tables = ", ".join(connection.ops.quote_name(model._meta.db_table) for model in models)
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE TABLE {tables} RESTART IDENTITY CASCADE")
+    else:
+        for model in models:
+            model.objects.all()._raw_delete(model.objects.db)
     print("Database cleared!")
 
 
@@ -41,10 +48,12 @@ def seed_customers():
         {"name": "Jack Taylor", "email": "jack@example.com", "phone": "111-222-3333"},
     ]
     
-    created_customers = []
-    for customer_data in customers:
-        customer = Customer.objects.create(**customer_data)
-        created_customers.append(customer)
+    # Single multi-row INSERT instead of one per customer
+    created_customers = Customer.objects.bulk_create(
+        [Customer(**customer_data) for customer_data in customers],
+        batch_size=500
+    )
+    for customer in created_customers:
         print(f"  Created: {customer.name} ({customer.email})")
     
     print(f"✓ Created {len(created_customers)} customers")
@@ -69,10 +78,12 @@ def seed_products():
         {"name": "Pen Set", "price": Decimal("19.99"), "stock": 250},
     ]
     
-    created_products = []
-    for product_data in products:
-        product = Product.objects.create(**product_data)
-        created_products.append(product)
+    # Single multi-row INSERT instead of one per product
+    created_products = Product.objects.bulk_create(
+        [Product(**product_data) for product_data in products],
+        batch_size=500
+    )
+    for product in created_products:
         print(f"  Created: {product.name} - ${product.price} (Stock: {product.stock})")
     
     print(f"✓ Created {len(created_products)} products")
@@ -96,23 +107,27 @@ def seed_orders(customers, products):
         {"customer_idx": 9, "product_indices": [0, 1, 2, 3, 4]},  # Jack: Multiple items
     ]
     
-    created_orders = []
-    for order_data in orders_data:
-        customer = customers[order_data["customer_idx"]]
-        order_products = [products[idx] for idx in order_data["product_indices"]]
+    # Totals are known up front, so each order is inserted once and all
+    # order/product links go in with a single bulk INSERT
+    with transaction.atomic():
+        created_orders = Order.objects.bulk_create([
+            Order(
+                customer=customers[order_data["customer_idx"]],
+                total_amount=sum(products[idx].price for idx in order_data["product_indices"])
+            )
+            for order_data in orders_data
+        ])
         
-        with transaction.atomic():
-            order = Order.objects.create(customer=customer)
-            order.products.set(order_products)
-            
-            # Calculate total amount
-            total = sum(p.price for p in order_products)
-            order.total_amount = total
-            order.save()
-            
-            created_orders.append(order)
-            product_names = ", ".join([p.name for p in order_products])
-            print(f"  Created: Order #{order.id} for {customer.name} - ${order.total_amount} ({product_names})")
+        OrderProduct = Order.products.through
+        OrderProduct.objects.bulk_create([
+            OrderProduct(order_id=order.id, product_id=products[idx].id)
+            for order, order_data in zip(created_orders, orders_data)
+            for idx in order_data["product_indices"]
+        ])
+    
+    for order, order_data in zip(created_orders, orders_data):
+        product_names = ", ".join([products[idx].name for idx in order_data["product_indices"]])
+        print(f"  Created: Order #{order.id} for {order.customer.name} - ${order.total_amount} ({product_names})")
     
     print(f"✓ Created {len(created_orders)} orders")
     return created_orders
@@ -1,47 +1,56 @@
-import requests 
+import functools
+import httpx
+import os
 from celery import shared_task
 from gql import gql, Client
-from gql.transport.requests import RequestsHTTPTransport
+from gql.transport.httpx import HTTPXTransport
 from datetime import datetime
 
 GRAPHQL_ENDPOINT = 'http://localhost:8000/graphql'
 
-@shared_task
-def generate_crm_report():
-    transport = RequestsHTTPTransport(
+# Report query, parsed once at import
+_REPORT_QUERY = gql("""
+query {
+    totalCustomers
+    totalOrders
+    totalRevenue
+}
+""")
+
+
+@functools.lru_cache(maxsize=1)
+def _gql_session():
+    """Connected GraphQL session, created lazily and reused by later runs in this worker."""
+    transport = HTTPXTransport(
         url=GRAPHQL_ENDPOINT,
-        verify=True,
-        retries=3,
-    )
-    client = Client(transport=transport, fetch_schema_from_transport=True)
-
-    query = gql("""
-    query {
-        allCustomers {
-            totalCount
-        }
-        allOrders {
-            totalCount
-            edges {
-                node {
-                    totalAmount
-                }
-            }
-        }
-    }
-    """)
-
-    result = client.execute(query)
-    total_customers = result['allCustomers']['totalCount']
-    total_orders = result['allOrders']['totalCount']
-    total_revenue = sum(
-        edge['node']['totalAmount'] for edge in result['allOrders']['edges']
+        transport=httpx.HTTPTransport(
+            verify=True,
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(max_keepalive_connections=10),
+        ),
     )
+    # The report query is static; no need to introspect the server schema
+    client = Client(transport=transport, fetch_schema_from_transport=False)
+    return client.connect_sync()
+
+
+@shared_task
+def generate_crm_report():
+    result = _gql_session().execute(_REPORT_QUERY)
+    total_customers = result['totalCustomers']
+    total_orders = result['totalOrders']
+    total_revenue = result['totalRevenue']
 
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     log_line = f"{timestamp} - Report: {total_customers} customers, {total_orders} orders, {total_revenue} revenue\n"
 
-    with open("/tmp/crm_report_log.txt", "a") as f:
-        f.write(log_line)
+    # Unbuffered O_APPEND write: one write() per line, so lines from
+    # concurrent workers don't interleave
+    fd = os.open("/tmp/crm_report_log.txt", os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, log_line.encode())
+    finally:
+        os.close(fd)
 
     return log_line
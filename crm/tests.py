@@ -1,3 +1,335 @@
+import importlib.util
+import json
+from datetime import timedelta
+from decimal import Decimal
+from hashlib import sha256
+from pathlib import Path
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from graphene_django.views import GraphQLView
+from graphql import parse, validate
+
+from alx_backend_graphql.schema import schema
+
+from . import views
+from .filters import CustomerFilter, ProductFilter, OrderFilter
+from .models import Customer, Product, Order
+from .schema import LIST_MAX_LIMIT, filter_list
+from .views import PersistedQueryGraphQLView
+
+
+class GraphQLTestCase(TestCase):
+    """Posts JSON bodies to the /graphql endpoint"""
+
+    def setUp(self):
+        views.persisted_queries.clear()
+        views.introspection_responses.clear()
+
+    def post(self, body):
+        return self.client.post('/graphql', data=json.dumps(body), content_type='application/json')
+
+
+class FilterListTests(TestCase):
+    """*FilterInput keys and values go through the FilterSets"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Customer.objects.create(name='Alice', email='alice@example.com', phone='+1234567890')
+        cls.bob = Customer.objects.create(name='Bob', email='bob@shop.org', phone='555-123-4567')
+        cls.laptop = Product.objects.create(name='Laptop', price=Decimal('999.99'), stock=5)
+        cls.mouse = Product.objects.create(name='Mouse', price=Decimal('29.99'), stock=200)
+        cls.big_order = Order.objects.create(customer=cls.alice, total_amount=Decimal('1500.00'))
+        cls.small_order = Order.objects.create(customer=cls.bob, total_amount=Decimal('20.00'))
+        Order.objects.filter(pk=cls.small_order.pk).update(order_date=timezone.now() - timedelta(days=30))
+
+    def test_icontains_keys_map_to_filterset_names(self):
+        customers = filter_list(CustomerFilter, Customer.objects.all(), {'name_icontains': 'ali'}, None, None)
+        self.assertEqual(list(customers), [self.alice])
+
+        customers = filter_list(CustomerFilter, Customer.objects.all(), {'email_icontains': 'shop'}, None, None)
+        self.assertEqual(list(customers), [self.bob])
+
+        products = filter_list(ProductFilter, Product.objects.all(), {'name_icontains': 'mou'}, None, None)
+        self.assertEqual(list(products), [self.mouse])
+
+    def test_unset_keys_are_ignored(self):
+        customers = filter_list(
+            CustomerFilter, Customer.objects.all(), {'name_icontains': None, 'phone_pattern': '+1'}, 'name', None
+        )
+        self.assertEqual(list(customers), [self.alice])
+
+    def test_decimal_and_boolean_values(self):
+        products = filter_list(ProductFilter, Product.objects.all(), {'price_gte': Decimal('100')}, None, None)
+        self.assertEqual(list(products), [self.laptop])
+
+        products = filter_list(ProductFilter, Product.objects.all(), {'low_stock': True}, None, None)
+        self.assertEqual(list(products), [self.laptop])
+
+        products = filter_list(ProductFilter, Product.objects.all(), {'low_stock': False}, 'name', None)
+        self.assertEqual(list(products), [self.laptop, self.mouse])
+
+        orders = filter_list(OrderFilter, Order.objects.all(), {'high_value': True}, None, None)
+        self.assertEqual(list(orders), [self.big_order])
+
+    def test_datetime_values(self):
+        since = timezone.now() - timedelta(days=7)
+        orders = filter_list(OrderFilter, Order.objects.all(), {'order_date_gte': since}, None, None)
+        self.assertEqual(list(orders), [self.big_order])
+
+        orders = filter_list(OrderFilter, Order.objects.all(), {'order_date_lte': since}, None, None)
+        self.assertEqual(list(orders), [self.small_order])
+
+    def test_order_by_and_limit(self):
+        customers = filter_list(CustomerFilter, Customer.objects.all(), None, '-name', 1)
+        self.assertEqual(list(customers), [self.bob])
+
+        customers = filter_list(CustomerFilter, Customer.objects.all(), None, None, LIST_MAX_LIMIT + 1)
+        self.assertEqual(customers.query.high_mark, LIST_MAX_LIMIT)
+
+
+class ListQueryTests(GraphQLTestCase):
+    """Flat *List fields coerce GraphQL input into FilterSet data"""
+
+    def test_products_list_filter(self):
+        Product.objects.create(name='Laptop', price=Decimal('999.99'), stock=5)
+        Product.objects.create(name='Mouse', price=Decimal('29.99'), stock=200)
+        Product.objects.create(name='Cable', price=Decimal('9.99'), stock=3)
+
+        response = self.post({
+            'query': '{ productsList(filter: {priceGte: "10.00", lowStock: true}) { name } }'
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['productsList'], [{'name': 'Laptop'}])
+
+
+class OrderQuerysetTests(GraphQLTestCase):
+    """Order connections only prefetch products when they may be selected"""
+
+    def test_products_not_prefetched_unless_selected(self):
+        customer = Customer.objects.create(name='Alice', email='alice@example.com')
+        laptop = Product.objects.create(name='Laptop', price=Decimal('999.99'), stock=5)
+        for _ in range(2):
+            Order.objects.create(customer=customer, total_amount=laptop.price).products.add(laptop)
+
+        query = """
+            {
+                allOrders(first: 5) {
+                    edges { node { id customer { orders(first: 5) { edges { node { id } } } } } }
+                }
+            }
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post({'query': query})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('errors', response.json())
+        self.assertFalse(
+            [q['sql'] for q in queries.captured_queries if '"crm_product"' in q['sql']]
+        )
+
+
+class PersistedQueryTests(GraphQLTestCase):
+    """Automatic Persisted Queries: miss, register, hit"""
+
+    QUERY = '{ totalRevenue }'
+
+    def extensions(self, query_hash=None):
+        query_hash = query_hash or sha256(self.QUERY.encode('utf-8')).hexdigest()
+        return {'persistedQuery': {'version': 1, 'sha256Hash': query_hash}}
+
+    def test_miss_register_hit(self):
+        response = self.post({'extensions': self.extensions()})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('PersistedQueryNotFound', response.content.decode())
+
+        response = self.post({'query': self.QUERY, 'extensions': self.extensions()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'], {'totalRevenue': '0.00'})
+
+        response = self.post({'extensions': self.extensions()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'], {'totalRevenue': '0.00'})
+
+    def test_hash_mismatch_is_rejected(self):
+        response = self.post({'query': self.QUERY, 'extensions': self.extensions('0' * 64)})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(views.persisted_queries, {})
+
+    def test_malformed_extensions_are_rejected(self):
+        for extensions in (['persistedQuery'], {'persistedQuery': 'abc'}, {'persistedQuery': {'sha256Hash': 1}}):
+            response = self.post({'query': self.QUERY, 'extensions': extensions})
+            self.assertEqual(response.status_code, 400, extensions)
+
+    def test_least_recently_used_query_is_evicted(self):
+        with mock.patch.object(views, 'PERSISTED_QUERY_LIMIT', 2):
+            views.register_persisted_query('a', '{ a }')
+            views.register_persisted_query('b', '{ b }')
+            self.assertEqual(views.get_persisted_query('a'), '{ a }')
+            views.register_persisted_query('c', '{ c }')
+
+        self.assertIsNone(views.get_persisted_query('b'))
+        self.assertEqual(list(views.persisted_queries), ['a', 'c'])
+
+
+def load_order_reminders():
+    """Import the standalone send_order_reminders.py script as a module"""
+    path = Path(__file__).resolve().parent / 'cron_jobs' / 'send_order_reminders.py'
+    spec = importlib.util.spec_from_file_location('send_order_reminders', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class PersistedQueryDocumentTests(TestCase):
+    """APQ payloads built at import by the cron clients match the server schema"""
+
+    def assertValidPersistedQuery(self, persisted):
+        query = persisted['query']
+        self.assertEqual(
+            persisted['extensions']['persistedQuery']['sha256Hash'],
+            sha256(query.encode('utf-8')).hexdigest(),
+        )
+        self.assertEqual(validate(schema.graphql_schema, parse(query)), [])
+
+    def test_cron_documents(self):
+        from . import cron
+
+        self.assertValidPersistedQuery(cron._HELLO_APQ)
+        self.assertValidPersistedQuery(cron._LOW_STOCK_APQ)
+
+    def test_order_reminders_document(self):
+        self.assertValidPersistedQuery(load_order_reminders().RECENT_ORDERS_APQ)
+
+
+class CRMReportTests(GraphQLTestCase):
+    """generate_crm_report's query is valid and answered by DB aggregates"""
+
+    def test_report_query(self):
+        from .tasks import _REPORT_QUERY
+
+        self.assertEqual(validate(schema.graphql_schema, _REPORT_QUERY), [])
+
+        customer = Customer.objects.create(name='Alice', email='alice@example.com')
+        Order.objects.create(customer=customer, total_amount=Decimal('5.30'))
+        Order.objects.create(customer=customer, total_amount=Decimal('1.00'))
+
+        response = self.post({'query': '{ totalCustomers totalOrders totalRevenue }'})
+        self.assertEqual(
+            response.json()['data'],
+            {'totalCustomers': 1, 'totalOrders': 2, 'totalRevenue': '6.30'},
+        )
+
+
+class IntrospectionCacheTests(GraphQLTestCase):
+    """Repeated introspection queries are answered from the response cache"""
+
+    QUERY = '{ __schema { queryType { name } } }'
+
+    def test_is_introspection_query(self):
+        self.assertTrue(views.is_introspection_query(self.QUERY))
+        self.assertTrue(views.is_introspection_query('{ __type(name: "Query") { name } }'))
+        self.assertFalse(views.is_introspection_query('{ __typename totalRevenue }'))
+        self.assertFalse(views.is_introspection_query('{ __schema { queryType { name } } totalRevenue }'))
+        self.assertFalse(views.is_introspection_query('mutation { __schema { queryType { name } } }'))
+        self.assertFalse(views.is_introspection_query(
+            self.QUERY + ' ' * views.INTROSPECTION_QUERY_MAX_LENGTH
+        ))
+
+    def test_repeated_introspection_is_cached(self):
+        with mock.patch.object(
+            PersistedQueryGraphQLView, 'get_response', autospec=True, side_effect=GraphQLView.get_response
+        ) as get_response:
+            first = self.post({'query': self.QUERY})
+            second = self.post({'query': self.QUERY})
+
+        self.assertEqual(get_response.call_count, 1)
+        self.assertEqual(first.json(), {'data': {'__schema': {'queryType': {'name': 'Query'}}}})
+        self.assertEqual(second.content, first.content)
+
+    def test_cache_key_includes_variables(self):
+        self.post({'query': self.QUERY})
+        self.post({'query': self.QUERY, 'variables': {'unused': 1}})
+        self.assertEqual(len(views.introspection_responses), 2)
+
+    def test_ordinary_queries_are_not_cached(self):
+        response = self.post({'query': '{ __typename totalRevenue }'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(views.introspection_responses, {})
+
+
+class CreateOrderTests(GraphQLTestCase):
+    """CreateOrder validates and totals its products in the database"""
+
+    MUTATION = """
+        mutation CreateOrder($customerId: ID!, $productIds: [ID!]!) {
+            createOrder(input: {customerId: $customerId, productIds: $productIds}) {
+                success
+                message
+                order {
+                    totalAmount
+                }
+            }
+        }
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.customer = Customer.objects.create(name='Alice', email='alice@example.com')
+        self.laptop = Product.objects.create(name='Laptop', price=Decimal('10.00'), stock=5)
+        self.mouse = Product.objects.create(name='Mouse', price=Decimal('20.00'), stock=5)
+
+    def create_order(self, product_ids, customer_id=None):
+        response = self.post({
+            'query': self.MUTATION,
+            'variables': {
+                'customerId': str(customer_id or self.customer.pk),
+                'productIds': [str(pk) for pk in product_ids],
+            },
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data']['createOrder']
+
+    def test_duplicate_product_ids_are_counted_once(self):
+        result = self.create_order([self.laptop.pk, self.laptop.pk, self.mouse.pk])
+
+        self.assertTrue(result['success'], result['message'])
+        self.assertEqual(Decimal(result['order']['totalAmount']), Decimal('30.00'))
+        order = Order.objects.get()
+        self.assertEqual(order.customer_id, self.customer.pk)
+        self.assertEqual(order.products.count(), 2)
+
+    def test_total_is_returned_in_cents(self):
+        pen = Product.objects.create(name='Pen', price=Decimal('0.10'), stock=5)
+        pencil = Product.objects.create(name='Pencil', price=Decimal('0.20'), stock=5)
+        result = self.create_order([pen.pk, pencil.pk])
+
+        self.assertTrue(result['success'], result['message'])
+        self.assertEqual(result['order']['totalAmount'], '0.30')
+        self.assertTrue(result['message'].endswith('with total $0.30'), result['message'])
+
+        notebook = Product.objects.create(name='Notebook', price=Decimal('5.00'), stock=5)
+        result = self.create_order([notebook.pk])
+
+        self.assertEqual(result['order']['totalAmount'], '5.00')
+        self.assertTrue(result['message'].endswith('with total $5.00'), result['message'])
+
+    def test_unknown_product_is_rejected(self):
+        missing = self.mouse.pk + 100
+        result = self.create_order([self.laptop.pk, missing])
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['message'], f'Invalid product ID: {missing}')
+        self.assertFalse(Order.objects.exists())
+
+    def test_unknown_customer_is_rejected(self):
+        missing = self.customer.pk + 100
+        result = self.create_order([self.laptop.pk], customer_id=missing)
 
-# Create your tests here.
+        self.assertFalse(result['success'])
+        self.assertEqual(result['message'], f'Customer with ID {missing} does not exist')
+        self.assertFalse(Order.objects.exists())
@@ -1,3 +1,151 @@
-from django.shortcuts import render
+import json
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from hashlib import sha256
+from threading import Lock
 
-# Create your views here.
+from django.http import HttpResponseBadRequest
+from graphene_django.views import GraphQLView, HttpError
+from graphql import FieldNode, GraphQLError, OperationDefinitionNode, OperationType, parse
+
+
+# sha256 -> query text registered by Automatic Persisted Query (APQ) clients.
+# Least recently used entries are evicted past the cap, so the registry
+# stays bounded without ever refusing new queries.
+PERSISTED_QUERY_LIMIT = 1000
+persisted_queries = OrderedDict()
+persisted_queries_lock = Lock()
+
+# (schema, query hash, operation, variables, pretty) -> encoded introspection response.
+# Introspection output only changes with the schema, which is built once per process.
+INTROSPECTION_CACHE_LIMIT = 32
+introspection_responses = {}
+
+INTROSPECTION_FIELDS = {"__schema", "__type", "__typename"}
+
+# Cheap pre-check before parsing: introspection queries name __schema or
+# __type (not just __typename, which ordinary queries select too)
+INTROSPECTION_MARKER = re.compile(r"__(schema|type)\b")
+
+# Standard introspection queries are a few KB; larger documents are never
+# parsed, cached or treated as introspection
+INTROSPECTION_QUERY_MAX_LENGTH = 16 * 1024
+
+
+def register_persisted_query(query_hash, query):
+    """Store query under its hash, evicting the least recently used past the cap"""
+    with persisted_queries_lock:
+        persisted_queries[query_hash] = query
+        persisted_queries.move_to_end(query_hash)
+        while len(persisted_queries) > PERSISTED_QUERY_LIMIT:
+            persisted_queries.popitem(last=False)
+
+
+def get_persisted_query(query_hash):
+    """Registered query text for query_hash (marking it recently used), or None"""
+    with persisted_queries_lock:
+        query = persisted_queries.get(query_hash)
+        if query is not None:
+            persisted_queries.move_to_end(query_hash)
+        return query
+
+
+def is_introspection_query(query):
+    """True if every operation in query is a query selecting only introspection fields"""
+    if len(query) > INTROSPECTION_QUERY_MAX_LENGTH or not INTROSPECTION_MARKER.search(query):
+        return False
+    return _is_introspection_document(query)
+
+
+@lru_cache(maxsize=256)
+def _is_introspection_document(query):
+    try:
+        document = parse(query)
+    except GraphQLError:
+        return False
+    operations = [
+        definition for definition in document.definitions
+        if isinstance(definition, OperationDefinitionNode)
+    ]
+    if not operations:
+        return False
+    for operation in operations:
+        if operation.operation != OperationType.QUERY:
+            return False
+        for selection in operation.selection_set.selections:
+            if not isinstance(selection, FieldNode):
+                return False
+            if selection.name.value not in INTROSPECTION_FIELDS:
+                return False
+    return True
+
+
+class PersistedQueryGraphQLView(GraphQLView):
+    """
+    GraphQLView with Automatic Persisted Queries support
+
+    Clients send {"extensions": {"persistedQuery": {"version": 1, "sha256Hash": ...}}}
+    without a query; on a miss the view answers PersistedQueryNotFound and the
+    client re-sends the full query with the same extension to register it.
+    """
+
+    def get_graphql_params(self, request, data):
+        query, variables, operation_name, id = super().get_graphql_params(request, data)
+
+        extensions = request.GET.get("extensions") or data.get("extensions")
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+        if not extensions:
+            return query, variables, operation_name, id
+        if not isinstance(extensions, dict):
+            raise HttpError(HttpResponseBadRequest("Extensions must be an object."))
+
+        persisted = extensions.get("persistedQuery")
+        if not persisted:
+            return query, variables, operation_name, id
+        if not isinstance(persisted, dict) or not isinstance(persisted.get("sha256Hash"), str):
+            raise HttpError(HttpResponseBadRequest("persistedQuery must be an object with a sha256Hash."))
+
+        query_hash = persisted["sha256Hash"]
+        if query:
+            if sha256(query.encode("utf-8")).hexdigest() != query_hash:
+                raise HttpError(HttpResponseBadRequest("provided sha does not match query"))
+            register_persisted_query(query_hash, query)
+        else:
+            query = get_persisted_query(query_hash)
+            if query is None:
+                raise HttpError(HttpResponseBadRequest("PersistedQueryNotFound"))
+
+        return query, variables, operation_name, id
+
+
+class CRMGraphQLView(PersistedQueryGraphQLView):
+    """
+    Persisted-query GraphQLView that serves repeated introspection queries
+    (GraphiQL, codegen, gql clients) from a cache of encoded responses
+    """
+
+    def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, _id = self.get_graphql_params(request, data)
+        if not query or not is_introspection_query(query):
+            return super().get_response(request, data, show_graphiql)
+
+        key = (
+            id(self.schema),
+            sha256(query.encode("utf-8")).hexdigest(),
+            operation_name,
+            json.dumps(variables, sort_keys=True, default=str),
+            bool(show_graphiql or self.pretty or request.GET.get("pretty")),
+        )
+        cached = introspection_responses.get(key)
+        if cached is not None:
+            return cached
+
+        result, status_code = super().get_response(request, data, show_graphiql)
+        if status_code == 200 and len(introspection_responses) < INTROSPECTION_CACHE_LIMIT:
+            introspection_responses[key] = (result, status_code)
+        return result, status_code
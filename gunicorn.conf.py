@@ -0,0 +1,6 @@
+# gunicorn -c gunicorn.conf.py
+wsgi_app = 'alx_backend_graphql.wsgi:application'
+
+# Import the app (and build the GraphQL schema) once in the master process;
+# workers inherit it on fork instead of rebuilding it at boot
+preload_app = True